@@ -9,12 +9,18 @@ For PhD Application - Stanford University
 """
 
 import dash
-from dash import dcc, html, Input, Output
+import flask
+from dash import dcc, html, ctx, clientside_callback, Input, Output, Patch, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
+import polars as pl
 import numpy as np
 import os
+import tempfile
+from functools import lru_cache
 
 # =============================================================================
 # CONFIGURATION
@@ -29,85 +35,148 @@ COLOR_MARTA_STOP = '#4A4A4A'
 # Map center
 ATLANTA_CENTER = {'lat': 33.7490, 'lon': -84.3880}
 
+# MARTA stops are clipped to the map view only above this many stops
+MARTA_CLIP_THRESHOLD = 500
+# Half-width of the map in pixels used to estimate the view from center/zoom
+# (generous, so stops just outside the estimate are still sent)
+MAP_VIEW_HALF_WIDTH_PX = 800
+
+# Layers shown on first load
+DEFAULT_LAYERS = ['food_deserts', 'existing', 'new']
+# Rapid layer-toggle clicks within this window are coalesced into one update
+LAYER_TOGGLE_DEBOUNCE_MS = 100
+
+# Serialize figures with orjson (numpy arrays encoded natively)
+pio.json.config.default_engine = 'orjson'
+
 # =============================================================================
 # LOAD DATA
 # =============================================================================
 
+def read_cached(path, reader):
+    """Read a source file through a Parquet cache stored next to it.
+    
+    The source (.xlsx/.csv) stays the source of truth; it is only parsed
+    when the cache is missing, older than the source, or unreadable.
+    """
+    cache_path = os.path.splitext(path)[0] + '.parquet'
+    if (os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(path)):
+        try:
+            return pd.read_parquet(cache_path)
+        except (OSError, ValueError):
+            pass  # Corrupt/partial cache: re-parse the source below
+    
+    df = reader(path)
+    
+    # Write to a temp file and swap it in, so a killed process or another
+    # worker never sees a partially written cache
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            suffix='.parquet.tmp', dir=os.path.dirname(cache_path) or '.')
+        os.close(fd)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        # Read-only filesystem or a column Arrow can't store:
+        # serve the parsed source without caching it
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+def read_excel(path):
+    """Parse an Excel sheet with Polars' calamine (Rust) reader"""
+    return pl.read_excel(path, engine='calamine').to_pandas()
+
+def read_csv(path):
+    """Parse a CSV with Polars' multithreaded reader"""
+    return pl.read_csv(path).to_pandas()
+
 def load_data():
     """Load all necessary data files"""
     print("Loading data...")
     
     # Load demand points (food deserts)
-    df_demand = pd.read_excel("demand_points_weight_hunv.xlsx")
+    df_demand = read_cached("demand_points_weight_hunv.xlsx", read_excel)
     print(f"Loaded {len(df_demand)} food desert tracts")
     
     # Load facilities
-    df_facilities = pd.read_excel("facilities_all_fixed_marta.xlsx")
+    df_facilities = read_cached("facilities_all_fixed_marta.xlsx", read_excel)
     df_existing = df_facilities[df_facilities['facility_type'] == 'existing'].copy()
     df_candidates = df_facilities[df_facilities['facility_type'] == 'candidate'].copy()
     print(f"Loaded {len(df_existing)} existing stores, {len(df_candidates)} candidates")
     
     # Load MARTA stops
-    df_edges = pd.read_csv("marta_stop_pair_stats_with_modes.csv")
+    df_edges = read_cached("marta_stop_pair_stats_with_modes.csv", read_csv)
     
-    # Extract unique stops
-    from_stops = df_edges[['from_stop_id', 'from_lat', 'from_lon']].rename(
-        columns={'from_stop_id': 'stop_id', 'from_lat': 'lat', 'from_lon': 'lon'}
-    )
-    to_stops = df_edges[['to_stop_id', 'to_lat', 'to_lon']].rename(
-        columns={'to_stop_id': 'stop_id', 'to_lat': 'lat', 'to_lon': 'lon'}
-    )
-    df_stops = pd.concat([from_stops, to_stops], ignore_index=True)
-    df_stops = df_stops.drop_duplicates(subset='stop_id').reset_index(drop=True)
+    # Extract unique stops (first occurrence of each stop_id wins)
+    ids = np.concatenate([df_edges['from_stop_id'].to_numpy(), df_edges['to_stop_id'].to_numpy()])
+    lats = np.concatenate([df_edges['from_lat'].to_numpy(), df_edges['to_lat'].to_numpy()])
+    lons = np.concatenate([df_edges['from_lon'].to_numpy(), df_edges['to_lon'].to_numpy()])
+    del df_edges
+    
+    stop_ids, first_idx = np.unique(ids, return_index=True)
+    df_stops = pd.DataFrame({
+        'stop_id': stop_ids,
+        'lat': lats[first_idx],
+        'lon': lons[first_idx],
+    })
     print(f"Loaded {len(df_stops)} MARTA stops")
     
+    # float32 keeps ~7 significant digits, plenty for map markers, and halves
+    # the size of the coordinates serialized to the browser
+    for df in (df_demand, df_existing, df_candidates, df_stops):
+        df[['lat', 'lon']] = df[['lat', 'lon']].astype('float32')
+    df_demand['weight'] = df_demand['weight'].astype('int32')
+    
     return df_demand, df_existing, df_candidates, df_stops
 
-# Load data
+# Load data (once per process; under gunicorn --preload, in the master)
 df_demand, df_existing, df_candidates, df_stops = load_data()
 
+TOTAL_HUNV = int(df_demand['weight'].sum())
+
 # =============================================================================
 # SIMULATION FUNCTIONS
 # =============================================================================
 
 def simulate_greedy_selection(max_p=57):
-    """Simulate facility selection order"""
-    np.random.seed(42)
-    selected_order = df_candidates.sample(n=min(max_p, len(df_candidates))).index.tolist()
-    return [df_candidates.loc[idx, 'facility_id'] for idx in selected_order[:max_p]]
+    """Simulate facility selection order (as df_candidates row positions)"""
+    rng = np.random.default_rng(42)
+    return rng.choice(len(df_candidates), size=min(max_p, len(df_candidates)), replace=False)
+
+# Metrics at the evaluated values of p; intermediate p is interpolated
+METRICS_LOOKUP = {
+    0: {'time': 48.02, 'tracts': 0, 'hunv': 0},
+    1: {'time': 45.41, 'tracts': 2, 'hunv': 1220},
+    2: {'time': 43.04, 'tracts': 4, 'hunv': 1890},
+    5: {'time': 38.29, 'tracts': 11, 'hunv': 4427},
+    10: {'time': 33.86, 'tracts': 21, 'hunv': 7266},
+    15: {'time': 30.31, 'tracts': 31, 'hunv': 9273},
+    20: {'time': 27.87, 'tracts': 38, 'hunv': 11072},
+    30: {'time': 25.14, 'tracts': 49, 'hunv': 13349},
+    40: {'time': 23.01, 'tracts': 57, 'hunv': 14232},
+    50: {'time': 20.83, 'tracts': 57, 'hunv': 14232},
+    57: {'time': 20.00, 'tracts': 57, 'hunv': 14232},
+}
 
+_P = np.array(sorted(METRICS_LOOKUP), dtype=float)
+_TIME = np.array([METRICS_LOOKUP[k]['time'] for k in sorted(METRICS_LOOKUP)])
+_TRACTS = np.array([METRICS_LOOKUP[k]['tracts'] for k in sorted(METRICS_LOOKUP)], dtype=float)
+_HUNV = np.array([METRICS_LOOKUP[k]['hunv'] for k in sorted(METRICS_LOOKUP)], dtype=float)
+
+@lru_cache(maxsize=64)
 def calculate_metrics(p):
-    """Calculate metrics for given number of facilities"""
+    """Calculate metrics for given number of facilities (cached per p)"""
     baseline_time = 48.02
-    total_hunv = df_demand['weight'].sum()
     
-    metrics_lookup = {
-        0: {'time': 48.02, 'tracts': 0, 'hunv': 0},
-        1: {'time': 45.41, 'tracts': 2, 'hunv': 1220},
-        2: {'time': 43.04, 'tracts': 4, 'hunv': 1890},
-        5: {'time': 38.29, 'tracts': 11, 'hunv': 4427},
-        10: {'time': 33.86, 'tracts': 21, 'hunv': 7266},
-        15: {'time': 30.31, 'tracts': 31, 'hunv': 9273},
-        20: {'time': 27.87, 'tracts': 38, 'hunv': 11072},
-        30: {'time': 25.14, 'tracts': 49, 'hunv': 13349},
-        40: {'time': 23.01, 'tracts': 57, 'hunv': 14232},
-        50: {'time': 20.83, 'tracts': 57, 'hunv': 14232},
-        57: {'time': 20.00, 'tracts': 57, 'hunv': 14232},
+    metrics = {
+        'time': float(np.interp(p, _P, _TIME)),
+        'tracts': int(np.interp(p, _P, _TRACTS)),
+        'hunv': int(np.interp(p, _P, _HUNV)),
     }
     
-    keys = sorted(metrics_lookup.keys())
-    if p in metrics_lookup:
-        metrics = metrics_lookup[p]
-    else:
-        lower = max([k for k in keys if k <= p])
-        upper = min([k for k in keys if k >= p])
-        ratio = (p - lower) / (upper - lower) if upper != lower else 0
-        metrics = {
-            'time': metrics_lookup[lower]['time'] + ratio * (metrics_lookup[upper]['time'] - metrics_lookup[lower]['time']),
-            'tracts': int(metrics_lookup[lower]['tracts'] + ratio * (metrics_lookup[upper]['tracts'] - metrics_lookup[lower]['tracts'])),
-            'hunv': int(metrics_lookup[lower]['hunv'] + ratio * (metrics_lookup[upper]['hunv'] - metrics_lookup[lower]['hunv'])),
-        }
-    
     improvement = baseline_time - metrics['time']
     improvement_pct = (improvement / baseline_time) * 100
     
@@ -118,19 +187,165 @@ def calculate_metrics(p):
         'improvement': improvement,
         'improvement_pct': improvement_pct,
         'total_tracts': len(df_demand),
-        'total_hunv': int(total_hunv),
+        'total_hunv': TOTAL_HUNV,
         'baseline_time': baseline_time
     }
 
 # Pre-calculate selection order
 FACILITY_SELECTION_ORDER = simulate_greedy_selection()
+# Marker labels "1".."n" for the new facilities, in selection order
+_LABELS = np.char.mod('%d', np.arange(1, len(FACILITY_SELECTION_ORDER) + 1))
+
+# =============================================================================
+# MAP FIGURE
+# =============================================================================
+
+# The figure is built (and validated by Plotly) once at import; callbacks
+# only patch trace visibility and the data that changes
+_STOP_LAT = df_stops['lat'].to_numpy()
+_STOP_LON = df_stops['lon'].to_numpy()
+_EXISTING_CUSTOMDATA = df_existing['facility_id'].to_numpy()
+_DEMAND_CUSTOMDATA = df_demand[['demand_id', 'weight']].to_numpy()
+
+# Candidate columns gathered by selection position in the callback
+_CANDIDATE_LAT = df_candidates['lat'].to_numpy()
+_CANDIDATE_LON = df_candidates['lon'].to_numpy()
+_CANDIDATE_IDS = df_candidates['facility_id'].to_numpy()
+
+# MARTA stops start empty; the callback fills them (clipped to the view)
+# once the layer is switched on
+TRACE_MARTA = go.Scattermap(
+    lat=[],
+    lon=[],
+    mode='markers',
+    marker=dict(size=3, color=COLOR_MARTA_STOP, opacity=0.3),
+    name='MARTA Stops',
+    hoverinfo='skip',
+    showlegend=True,
+    visible='marta' in DEFAULT_LAYERS
+)
+
+TRACE_EXISTING = go.Scattermap(
+    lat=df_existing['lat'],
+    lon=df_existing['lon'],
+    mode='markers',
+    marker=dict(size=6, color=COLOR_EXISTING_STORE),
+    name=f'Existing Stores (n={len(df_existing)})',
+    hovertemplate='<b>Existing Store</b><br>ID: %{customdata}<extra></extra>',
+    customdata=_EXISTING_CUSTOMDATA,
+    visible='existing' in DEFAULT_LAYERS
+)
+
+TRACE_FOOD_DESERTS = go.Scattermap(
+    lat=df_demand['lat'],
+    lon=df_demand['lon'],
+    mode='markers',
+    marker=dict(
+        size=10,
+        color=COLOR_FOOD_DESERT,
+        symbol='diamond'
+    ),
+    name=f'Food Deserts (n={len(df_demand)})',
+    hovertemplate='<b>Food Desert Tract</b><br>ID: %{customdata[0]}<br>HUNV: %{customdata[1]}<extra></extra>',
+    customdata=_DEMAND_CUSTOMDATA,
+    visible='food_deserts' in DEFAULT_LAYERS
+)
+
+def get_view_bounds(relayout_data):
+    """Return (lat_min, lat_max, lon_min, lon_max) of the map view, or None"""
+    if not relayout_data:
+        return None
+    
+    # Exact corners when the map reports them
+    derived = relayout_data.get('map._derived')
+    if derived and derived.get('coordinates'):
+        lons, lats = zip(*derived['coordinates'])
+        return min(lats), max(lats), min(lons), max(lons)
+    
+    # Otherwise estimate from center/zoom (512px web-mercator tiles)
+    center = relayout_data.get('map.center')
+    zoom = relayout_data.get('map.zoom')
+    if center is None or zoom is None:
+        return None
+    half_lon = MAP_VIEW_HALF_WIDTH_PX * 360 / (512 * 2 ** zoom)
+    half_lat = half_lon * np.cos(np.radians(center['lat']))
+    return (center['lat'] - half_lat, center['lat'] + half_lat,
+            center['lon'] - half_lon, center['lon'] + half_lon)
+
+def get_marta_stops(relayout_data):
+    """MARTA stop coordinates, clipped to the current map view when large"""
+    if len(df_stops) <= MARTA_CLIP_THRESHOLD:
+        return _STOP_LAT, _STOP_LON
+    bounds = get_view_bounds(relayout_data)
+    if bounds is None:
+        return _STOP_LAT, _STOP_LON
+    
+    lat_min, lat_max, lon_min, lon_max = bounds
+    mask = ((_STOP_LAT > lat_min) & (_STOP_LAT < lat_max)
+            & (_STOP_LON > lon_min) & (_STOP_LON < lon_max))
+    return _STOP_LAT[mask], _STOP_LON[mask]
+
+# New facilities start empty and are filled in by the callback
+TRACE_NEW = go.Scattermap(
+    lat=[],
+    lon=[],
+    mode='markers+text',
+    marker=dict(
+        size=15,
+        color=COLOR_NEW_FACILITY,
+        symbol='star'
+    ),
+    textposition='middle center',
+    textfont=dict(size=8, color='black', family='Arial Black'),
+    name='New Facilities (p=0)',
+    hovertemplate='<b>New Facility #%{text}</b><br>ID: %{customdata}<extra></extra>',
+    visible=False
+)
+
+# Trace index in MAP_FIGURE, keyed by layer-toggle value
+LAYER_TRACE_INDEX = {'marta': 0, 'existing': 1, 'food_deserts': 2, 'new': 3}
+
+MAP_FIGURE = go.Figure(data=[TRACE_MARTA, TRACE_EXISTING, TRACE_FOOD_DESERTS, TRACE_NEW])
+MAP_FIGURE.update_layout(
+    map=dict(
+        style='carto-positron',
+        center=dict(lat=ATLANTA_CENTER['lat'], lon=ATLANTA_CENTER['lon']),
+        zoom=9.5
+    ),
+    margin=dict(l=0, r=0, t=0, b=0),
+    uirevision='map',  # keep the user's pan/zoom across updates
+    showlegend=True,
+    legend=dict(
+        yanchor="top",
+        y=0.99,
+        xanchor="left",
+        x=0.01,
+        bgcolor="rgba(255, 255, 255, 0.8)"
+    ),
+    hovermode='closest'
+)
 
 # =============================================================================
 # DASH APP
 # =============================================================================
 
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
-server = app.server  # Important for Render deployment!
+server = flask.Flask(__name__)  # Important for Render deployment!
+
+# Compress callback responses (figure JSON) and static assets; must be set
+# before Dash(compress=True) initializes Flask-Compress
+server.config['COMPRESS_MIMETYPES'] = [
+    'application/json', 'text/html', 'text/css', 'application/javascript'
+]
+server.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+
+# update_title=None: no "Updating..." title write on every callback
+app = dash.Dash(
+    __name__,
+    server=server,
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    compress=True,
+    update_title=None,
+)
 
 app.layout = dbc.Container([
     dbc.Row([
@@ -147,6 +362,7 @@ app.layout = dbc.Container([
         dbc.Col([
             dcc.Graph(
                 id='map',
+                figure=MAP_FIGURE,
                 style={'height': '700px'},
                 config={'displayModeBar': False}
             )
@@ -165,7 +381,8 @@ app.layout = dbc.Container([
                         step=1,
                         value=0,
                         marks={i: str(i) for i in [0, 10, 20, 30, 40, 50, 57]},
-                        tooltip={"placement": "bottom", "always_visible": True}
+                        tooltip={"placement": "bottom", "always_visible": True},
+                        updatemode='mouseup'
                     ),
                     
                     html.Hr(),
@@ -179,9 +396,11 @@ app.layout = dbc.Container([
                             {'label': ' MARTA Stops', 'value': 'marta'},
                             {'label': ' New Facilities', 'value': 'new'},
                         ],
-                        value=['food_deserts', 'existing', 'new'],
+                        value=DEFAULT_LAYERS,
                         switch=True,
                     ),
+                    # Debounced copy of the layer toggles (see clientside callback)
+                    dcc.Store(id='layer-store', data=DEFAULT_LAYERS),
                 ])
             ], className="mb-3"),
             
@@ -209,161 +428,112 @@ app.layout = dbc.Container([
 # CALLBACKS
 # =============================================================================
 
+# Debounce the layer toggles in the browser: only the last value within
+# LAYER_TOGGLE_DEBOUNCE_MS reaches the server
+clientside_callback(
+    """
+    function(value) {
+        const seq = window._layerToggleSeq = (window._layerToggleSeq || 0) + 1;
+        return new Promise(function(resolve) {
+            setTimeout(function() {
+                resolve(seq === window._layerToggleSeq
+                        ? value : window.dash_clientside.no_update);
+            }, %d);
+        });
+    }
+    """ % LAYER_TOGGLE_DEBOUNCE_MS,
+    Output('layer-store', 'data'),
+    Input('layer-toggles', 'value'),
+    prevent_initial_call=True
+)
+
 @app.callback(
     [Output('map', 'figure'),
      Output('metrics-display', 'children')],
     [Input('p-slider', 'value'),
-     Input('layer-toggles', 'value')]
+     Input('layer-store', 'data'),
+     Input('map', 'relayoutData')]
 )
-def update_visualization(p, visible_layers):
-    """Update map and metrics based on slider and toggles"""
+def update_visualization(p, visible_layers, relayout_data):
+    """Update map and metrics based on slider, toggles and map view"""
     
-    selected_facility_ids = FACILITY_SELECTION_ORDER[:p]
-    selected_facilities = df_candidates[df_candidates['facility_id'].isin(selected_facility_ids)]
-    metrics = calculate_metrics(p)
+    # Panning/zooming only matters for the clipped MARTA layer
+    if ctx.triggered_id == 'map' and (
+            'marta' not in visible_layers or get_view_bounds(relayout_data) is None):
+        raise PreventUpdate
     
-    # Create figure
-    fig = go.Figure()
+    # Patch the figure in place rather than resending it
+    patched = Patch()
+    marta = patched['data'][LAYER_TRACE_INDEX['marta']]
     
-    # MARTA stops
-    if 'marta' in visible_layers:
-        fig.add_trace(go.Scattermapbox(
-            lat=df_stops['lat'],
-            lon=df_stops['lon'],
-            mode='markers',
-            marker=dict(size=3, color=COLOR_MARTA_STOP, opacity=0.3),
-            name='MARTA Stops',
-            hoverinfo='skip',
-            showlegend=True
-        ))
+    # A view change only re-clips the MARTA stops
+    if ctx.triggered_id == 'map':
+        marta['lat'], marta['lon'] = get_marta_stops(relayout_data)
+        return patched, no_update
     
-    # Existing stores
-    if 'existing' in visible_layers:
-        fig.add_trace(go.Scattermapbox(
-            lat=df_existing['lat'],
-            lon=df_existing['lon'],
-            mode='markers',
-            marker=dict(size=6, color=COLOR_EXISTING_STORE),
-            name=f'Existing Stores (n={len(df_existing)})',
-            hovertemplate='<b>Existing Store</b><br>ID: %{customdata}<extra></extra>',
-            customdata=df_existing['facility_id']
-        ))
+    for layer in ('marta', 'existing', 'food_deserts'):
+        patched['data'][LAYER_TRACE_INDEX[layer]]['visible'] = layer in visible_layers
     
-    # Food deserts
-    if 'food_deserts' in visible_layers:
-        fig.add_trace(go.Scattermapbox(
-            lat=df_demand['lat'],
-            lon=df_demand['lon'],
-            mode='markers',
-            marker=dict(
-                size=10,
-                color=COLOR_FOOD_DESERT,
-                symbol='diamond',
-                line=dict(width=1, color='white')
-            ),
-            name=f'Food Deserts (n={len(df_demand)})',
-            hovertemplate='<b>Food Desert Tract</b><br>ID: %{customdata[0]}<br>HUNV: %{customdata[1]}<extra></extra>',
-            customdata=df_demand[['demand_id', 'weight']].values
-        ))
+    # Fill the stops when the layer is switched on, or on the initial call
+    # if it starts on (the figure ships without them)
+    if 'marta' in visible_layers and ctx.triggered_id != 'p-slider':
+        marta['lat'], marta['lon'] = get_marta_stops(relayout_data)
     
-    # New facilities
-    if 'new' in visible_layers and p > 0:
-        fig.add_trace(go.Scattermapbox(
-            lat=selected_facilities['lat'],
-            lon=selected_facilities['lon'],
-            mode='markers+text',
-            marker=dict(
-                size=15,
-                color=COLOR_NEW_FACILITY,
-                symbol='star',
-                line=dict(width=2, color='black')
-            ),
-            text=[str(i+1) for i in range(len(selected_facilities))],
-            textposition='middle center',
-            textfont=dict(size=8, color='black', family='Arial Black'),
-            name=f'New Facilities (p={p})',
-            hovertemplate='<b>New Facility #%{text}</b><br>ID: %{customdata}<extra></extra>',
-            customdata=selected_facilities['facility_id']
-        ))
+    selected_positions = FACILITY_SELECTION_ORDER[:p]
+    metrics = calculate_metrics(p)
     
-    # Update layout
-    fig.update_layout(
-        mapbox=dict(
-            style='carto-positron',
-            center=dict(lat=ATLANTA_CENTER['lat'], lon=ATLANTA_CENTER['lon']),
-            zoom=9.5
-        ),
-        margin=dict(l=0, r=0, t=0, b=0),
-        showlegend=True,
-        legend=dict(
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=0.01,
-            bgcolor="rgba(255, 255, 255, 0.8)"
-        ),
-        hovermode='closest'
-    )
+    new = patched['data'][LAYER_TRACE_INDEX['new']]
+    new['visible'] = 'new' in visible_layers and p > 0
+    new['lat'] = _CANDIDATE_LAT[selected_positions]
+    new['lon'] = _CANDIDATE_LON[selected_positions]
+    new['text'] = _LABELS[:p]
+    new['customdata'] = _CANDIDATE_IDS[selected_positions]
+    new['name'] = f'New Facilities (p={p})'
     
-    # Metrics display
+    # Metrics display: plain Markdown around the two progress bars; a
+    # block is split only where its className (color) changes
     metrics_html = [
-        html.H5(f"Facilities Added: {p}", className="mb-3"),
-        html.Hr(),
-        
-        dbc.Row([
-            dbc.Col([
-                html.P("Weighted Avg Travel Time:", className="mb-1 small text-muted"),
-                html.H4(f"{metrics['weighted_avg_time']:.2f} min", className="mb-0"),
-            ])
-        ]),
-        
-        dbc.Row([
-            dbc.Col([
-                html.P("Improvement from Baseline:", className="mb-1 small text-muted mt-3"),
-                html.H5(f"{metrics['improvement']:.2f} min ({metrics['improvement_pct']:.1f}%)", 
-                       className="mb-0 text-success"),
-            ])
-        ]),
-        
-        html.Hr(),
-        
-        dbc.Row([
-            dbc.Col([
-                html.P("Census Tracts Served:", className="mb-1 small text-muted"),
-                html.H5(f"{metrics['tracts_served']} / {metrics['total_tracts']}", className="mb-0"),
-                dbc.Progress(
-                    value=metrics['tracts_served'], 
-                    max=metrics['total_tracts'],
-                    className="mb-2",
-                    color="info"
-                ),
-            ])
-        ]),
-        
-        dbc.Row([
-            dbc.Col([
-                html.P("Households (HUNV) Served:", className="mb-1 small text-muted"),
-                html.H5(f"{metrics['hunv_served']:,} / {metrics['total_hunv']:,}", className="mb-0"),
-                dbc.Progress(
-                    value=metrics['hunv_served'], 
-                    max=metrics['total_hunv'],
-                    className="mb-2",
-                    color="success"
-                ),
-            ])
-        ]),
-        
-        html.Hr(),
-        
-        html.Small([
-            html.P(f"Baseline: {metrics['baseline_time']:.2f} min (no new facilities)", 
-                  className="text-muted mb-1"),
-            html.P(f"Phase transition at p≈38 (all tracts served)", 
-                  className="text-muted mb-0"),
-        ])
+        dcc.Markdown(
+            f"##### Facilities Added: {p}\n\n"
+            f"---\n\n"
+            f"**Weighted Avg Travel Time:**\n"
+            f"#### {metrics['weighted_avg_time']:.2f} min\n\n"
+            f"**Improvement from Baseline:**"
+        ),
+        dcc.Markdown(
+            f"##### {metrics['improvement']:.2f} min ({metrics['improvement_pct']:.1f}%)",
+            className="text-success"
+        ),
+        dcc.Markdown(
+            f"---\n\n"
+            f"**Census Tracts Served:**\n"
+            f"##### {metrics['tracts_served']} / {metrics['total_tracts']}"
+        ),
+        dbc.Progress(
+            value=metrics['tracts_served'], 
+            max=metrics['total_tracts'],
+            className="mb-2",
+            color="info"
+        ),
+        dcc.Markdown(
+            f"**Households (HUNV) Served:**\n"
+            f"##### {metrics['hunv_served']:,} / {metrics['total_hunv']:,}"
+        ),
+        dbc.Progress(
+            value=metrics['hunv_served'], 
+            max=metrics['total_hunv'],
+            className="mb-2",
+            color="success"
+        ),
+        dcc.Markdown(
+            f"---\n\n"
+            f"Baseline: {metrics['baseline_time']:.2f} min (no new facilities)\n\n"
+            f"Phase transition at p≈38 (all tracts served)",
+            className="small text-muted"
+        ),
     ]
     
-    return fig, metrics_html
+    return patched, metrics_html
 
 # =============================================================================
 # RUN APP